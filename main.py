@@ -1,26 +1,33 @@
 import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Form, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Form
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional, Union
+import collections
 import os
-import shutil
-import tempfile
-import json
+import time
+import uuid
 
-from src.analyzer.code_analyzer import CodeAnalyzer
-from src.analyzer.vulnerability_detector import VulnerabilityDetector
-from src.ml.vulnerability_classifier import VulnerabilityClassifier
-from src.ml.fix_generator import FixGenerator
-from src.dashboard.stats_generator import StatsGenerator
+import jwt
+import orjson
+import redis.asyncio
+
+from src.storage import (
+    REDIS_URL, SCAN_TTL_SECONDS,
+    scan_key, result_key, user_scans_key, user_agg_key, user_top_files_key, user_trend_key,
+    trend_window,
+)
+from src.celery_app import celery_app
+from src.dashboard.stats_generator import get_stats_generator
 
 app = FastAPI(
     title="CodeGuardian",
     description="ML-powered vulnerability scanner with intelligent remediation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -33,9 +40,18 @@ app.add_middleware(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# HMAC key used to sign and verify access tokens; there is deliberately no default
+if not os.environ.get("JWT_SECRET"):
+    raise RuntimeError(
+        "JWT_SECRET is not set. Set it to a long random string used to sign access tokens, "
+        "e.g. JWT_SECRET=$(python -c \"import secrets; print(secrets.token_hex(32))\")"
+    )
+JWT_SECRET = os.environ["JWT_SECRET"].encode()
+JWT_ALGORITHM = "HS256"
+
 class ScanRequest(BaseModel):
     repository_url: str
-    branch: Optional[str] = "main"
+    branch: Optional[str] = "main"  # None scans the repository's default branch
     depth: Optional[int] = 3
     scan_type: Optional[str] = "full"  # Options: full, quick, deep
 
@@ -52,11 +68,27 @@ class User(BaseModel):
     full_name: Optional[str] = None
     disabled: Optional[bool] = None
 
-# In-memory storage for demo purposes
-scan_results = {}
-active_scans = {}
+# In-memory storage for demo purposes; scan state and results live in Redis.
+# It starts empty, so /token rejects everyone until users are added here;
+# see the README for issuing tokens with create_access_token meanwhile.
 users_db = {}
 
+redis_client = redis.asyncio.Redis.from_url(REDIS_URL, decode_responses=True)
+
+async def get_user_scans(username: str) -> Dict[str, Dict]:
+    """Fetch the metadata of every unexpired scan requested by a user"""
+    # Scan IDs come back in the order the scans were started
+    scan_ids = await redis_client.zrangebyscore(
+        user_scans_key(username), time.time() - SCAN_TTL_SECONDS, "+inf"
+    )
+    
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for scan_id in scan_ids:
+            pipe.hgetall(scan_key(scan_id))
+        scan_infos = await pipe.execute()
+    
+    return {scan_id: scan_info for scan_id, scan_info in zip(scan_ids, scan_infos) if scan_info}
+
 @app.post("/token")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     # This is simplified for the example
@@ -77,50 +109,68 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     return {"access_token": access_token, "token_type": "bearer"}
 
 def create_access_token(data: dict, expires_delta: timedelta):
-    # This is a simplified token generator
-    # In production, use a proper JWT implementation
-    import uuid
-    import base64
-    import json
-    
-    token_data = data.copy()
-    token_data.update({"exp": datetime.now(timezone.utc) + expires_delta})
-    token_data.update({"jti": str(uuid.uuid4())})
-    encoded = base64.b64encode(json.dumps(token_data).encode())
-    return encoded.decode()
+    """Create a signed JWT access token"""
+    payload = {
+        **data,
+        "exp": datetime.now(timezone.utc) + expires_delta,
+        "jti": uuid.uuid4().hex,
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
-    # This would validate the token and return the user
-    # Simplified for demo
-    return User(username="demo_user")
+    """Validate the bearer token and return its user"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.PyJWTError:
+        raise credentials_exception
+    
+    username = payload.get("sub")
+    if username is None:
+        raise credentials_exception
+    
+    return User(username=username)
 
 @app.post("/scan", response_model=dict)
 async def start_scan(
     request: ScanRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
     """Start a new code scan based on repository URL"""
-    import uuid
     scan_id = str(uuid.uuid4())
+    now = time.time()
     
     # Store scan details
-    active_scans[scan_id] = {
-        "status": "in_progress",
-        "repository_url": request.repository_url,
-        "started_at": datetime.now().isoformat(),
-        "requested_by": current_user.username,
-    }
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(scan_key(scan_id), mapping={
+            "status": "in_progress",
+            "repository_url": request.repository_url,
+            "started_at": datetime.now().isoformat(),
+            "requested_by": current_user.username,
+        })
+        pipe.expire(scan_key(scan_id), SCAN_TTL_SECONDS)
+        
+        # Index the scan by start time and drop IDs whose scan has expired
+        scans_key = user_scans_key(current_user.username)
+        pipe.zadd(scans_key, {scan_id: now})
+        pipe.zremrangebyscore(scans_key, "-inf", now - SCAN_TTL_SECONDS)
+        pipe.expire(scans_key, SCAN_TTL_SECONDS)
+        await pipe.execute()
     
-    # Execute scan in background
-    background_tasks.add_task(
-        execute_scan,
+    # Queue the scan on a Celery worker by name; the API never imports the scanner
+    celery_app.send_task('execute_scan', args=[
         scan_id,
         request.repository_url,
         request.branch,
         request.depth,
-        request.scan_type
-    )
+        request.scan_type,
+        current_user.username
+    ])
     
     return {
         "scan_id": scan_id,
@@ -128,84 +178,28 @@ async def start_scan(
         "message": "Scan initiated successfully"
     }
 
-async def execute_scan(scan_id: str, repo_url: str, branch: str, depth: int, scan_type: str):
-    """Execute the actual code scanning process"""
-    try:
-        # Create temporary directory
-        temp_dir = tempfile.mkdtemp()
-        
-        # Clone repository
-        import git
-        git.Repo.clone_from(repo_url, temp_dir, branch=branch, depth=depth)
-        
-        # Initialize components
-        code_analyzer = CodeAnalyzer()
-        vuln_detector = VulnerabilityDetector()
-        vuln_classifier = VulnerabilityClassifier()
-        fix_generator = FixGenerator()
-        stats_generator = StatsGenerator()
-        
-        # Analyze code
-        file_list = code_analyzer.find_files(temp_dir)
-        vulnerabilities = []
-        
-        for file_path in file_list:
-            if code_analyzer.is_supported_file(file_path):
-                file_vulns = vuln_detector.scan_file(file_path)
-                if file_vulns:
-                    # Classify and enhance vulnerability data
-                    for vuln in file_vulns:
-                        classification = vuln_classifier.classify(vuln)
-                        suggested_fix = fix_generator.generate_fix(vuln)
-                        
-                        enhanced_vuln = {
-                            **vuln,
-                            "classification": classification,
-                            "suggested_fix": suggested_fix
-                        }
-                        vulnerabilities.append(enhanced_vuln)
-        
-        # Generate statistics
-        stats = stats_generator.generate(vulnerabilities)
-        risk_score = stats_generator.calculate_risk_score(vulnerabilities)
-        
-        # Store results
-        scan_results[scan_id] = {
-            "scan_id": scan_id,
-            "timestamp": datetime.now().isoformat(),
-            "vulnerabilities": vulnerabilities,
-            "stats": stats,
-            "risk_score": risk_score,
-        }
-        
-        # Update scan status
-        active_scans[scan_id]["status"] = "completed"
-        active_scans[scan_id]["completed_at"] = datetime.now().isoformat()
-        
-    except Exception as e:
-        active_scans[scan_id]["status"] = "failed"
-        active_scans[scan_id]["error"] = str(e)
-    finally:
-        # Clean up
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-
 @app.get("/scan/{scan_id}")
 async def get_scan_status(scan_id: str, current_user: User = Depends(get_current_user)):
     """Get the status and results of a scan"""
-    if scan_id not in active_scans:
+    scan_status = await redis_client.hgetall(scan_key(scan_id))
+    
+    # Other users' scans look missing, so scan IDs cannot be probed
+    if not scan_status or scan_status.get("requested_by") != current_user.username:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scan not found"
         )
     
-    scan_status = active_scans[scan_id]
+    results = None
+    if scan_status["status"] == "completed":
+        results = await redis_client.get(result_key(scan_id))
     
-    if scan_status["status"] == "completed" and scan_id in scan_results:
-        return {
+    if results is not None:
+        # Results are stored as JSON already; embed them without re-parsing
+        return ORJSONResponse({
             "status": scan_status["status"],
-            "results": scan_results[scan_id]
-        }
+            "results": orjson.Fragment(results)
+        })
     else:
         return {
             "status": scan_status["status"],
@@ -215,39 +209,64 @@ async def get_scan_status(scan_id: str, current_user: User = Depends(get_current
 @app.get("/scans")
 async def list_scans(current_user: User = Depends(get_current_user)):
     """List all scans for the current user"""
-    user_scans = {
-        scan_id: scan_info
-        for scan_id, scan_info in active_scans.items()
-        if scan_info["requested_by"] == current_user.username
-    }
-    return user_scans
+    return await get_user_scans(current_user.username)
 
 @app.get("/dashboard/stats")
 async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
     """Get aggregated statistics for the dashboard"""
-    stats_generator = StatsGenerator()
+    stats_generator = get_stats_generator()
+    username = current_user.username
+    now_iso = datetime.now().isoformat()
+    window_start, days = trend_window(time.time())
     
-    # Get completed scans for the user
-    user_scan_ids = [
-        scan_id for scan_id, info in active_scans.items()
-        if info["status"] == "completed" and info["requested_by"] == current_user.username
-    ]
+    # Read the daily totals and trend points of the window in one round trip
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for day in days:
+            for counter in ('', 'risk', 'type'):
+                pipe.hgetall(user_agg_key(username, day, counter))
+        
+        # Merge the daily file counts in Redis and read back only the top files
+        top_files_key = user_top_files_key(username)
+        pipe.zunionstore(top_files_key, [user_agg_key(username, day, 'file') for day in days])
+        pipe.zrevrange(top_files_key, 0, 4, withscores=True)
+        pipe.delete(top_files_key)
+        
+        pipe.zrangebyscore(user_trend_key(username), window_start, "+inf")
+        *day_counts, _, top_files, _, trend_points = await pipe.execute()
     
-    # Collect vulnerabilities from all completed scans
-    all_vulnerabilities = []
-    for scan_id in user_scan_ids:
-        if scan_id in scan_results:
-            all_vulnerabilities.extend(scan_results[scan_id]["vulnerabilities"])
+    # Sum the daily counters
+    totals = collections.Counter()
+    risk_counts = collections.Counter()
+    type_counts = collections.Counter()
+    for day_totals, day_risk, day_type in zip(day_counts[0::3], day_counts[1::3], day_counts[2::3]):
+        totals.update({field: float(value) for field, value in day_totals.items()})
+        risk_counts.update({field: int(count) for field, count in day_risk.items()})
+        type_counts.update({field: int(count) for field, count in day_type.items()})
     
     # Generate aggregated statistics
-    stats = stats_generator.generate(all_vulnerabilities)
-    trend_data = stats_generator.generate_trend_data(user_scan_ids, scan_results)
+    stats = stats_generator.from_aggregate({
+        'total': int(totals['total']),
+        'confidence_sum': totals['confidence_sum'],
+        'risk': risk_counts,
+        'type': type_counts,
+        'file': {file_path: int(count) for file_path, count in top_files},
+    }, now_iso=now_iso)
+    trend_data = stats_generator.generate_trend_data(orjson.loads(point) for point in trend_points)
     
     return {
         "overall_stats": stats,
         "trends": trend_data,
-        "scan_count": len(user_scan_ids),
+        "scan_count": int(totals['scans']),
     }
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Development server; in production run several workers under gunicorn:
+    #   gunicorn main:app -k uvicorn.workers.UvicornWorker -w $(( 2*$(nproc)+1 )) -b 0.0.0.0:8000
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WORKERS", "1")),
+    )
\ No newline at end of file
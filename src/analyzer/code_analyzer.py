@@ -1,7 +1,174 @@
 import os
+import functools
 import magic
-import re
-from typing import List, Dict, Any
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+
+# MIME types for supported extensions, so libmagic only sniffs unknown files
+_EXT_TO_MIME = {
+    '.py': 'text/x-python',
+    '.js': 'application/javascript',
+    '.ts': 'application/typescript',
+    '.java': 'text/x-java',
+    '.cpp': 'text/x-c++',
+    '.h': 'text/x-c',
+    '.c': 'text/x-c',
+    '.go': 'text/x-go',
+    '.rb': 'text/x-ruby',
+    '.php': 'text/x-php',
+    '.html': 'text/html',
+    '.css': 'text/css',
+    '.jsx': 'text/jsx',
+    '.tsx': 'text/tsx',
+    '.scala': 'text/x-scala',
+    '.rs': 'text/rust',
+    '.swift': 'text/x-swift',
+    '.kt': 'text/x-kotlin',
+    '.sh': 'text/x-shellscript',
+}
+
+# Statement prefixes counted as decision points / definitions in Python
+_PYTHON_COMPLEXITY_PREFIXES = (
+    'if ', 'elif ', 'else:', 'for ', 'while ', 'try:',
+    'except ', 'with ', 'def ', 'class ',
+)
+
+
+def _find_string_or_comment(line: str, pos: int) -> int:
+    """Return the index of the next quote or '#' at or after pos, or -1."""
+    found = -1
+    for char in '#"\'':
+        idx = line.find(char, pos)
+        if idx != -1 and (found == -1 or idx < found):
+            found = idx
+    return found
+
+
+def _scan_python_line(line: str, in_triple: Optional[str]) -> Tuple[bool, bool, Optional[str]]:
+    """Tokenize one stripped line of Python with str.find.
+
+    Returns (touches_triple, has_code, in_triple): whether any part of the
+    line lies inside a triple-quoted string, whether it holds code outside
+    strings and comments, and the triple-quote delimiter still open at the
+    end of the line. Single-quoted strings are skipped so quotes or '#'
+    inside them are not mistaken for delimiters.
+    """
+    touches_triple = in_triple is not None
+    has_code = False
+    pos = 0
+    length = len(line)
+
+    while pos < length:
+        if in_triple:
+            end = line.find(in_triple, pos)
+            if end == -1:
+                break
+            pos = end + 3
+            in_triple = None
+            continue
+
+        idx = _find_string_or_comment(line, pos)
+        if idx == -1:
+            if not has_code and line[pos:].strip():
+                has_code = True
+            break
+
+        # Anything before the token other than a string prefix is code
+        if not has_code and line[pos:idx].rstrip('rRbBuUfF').strip():
+            has_code = True
+
+        char = line[idx]
+        if char == '#':
+            break
+
+        if line.startswith(char * 3, idx):
+            touches_triple = True
+            in_triple = char * 3
+            pos = idx + 3
+            continue
+
+        # Single-quoted string: skip to the closing, unescaped quote
+        has_code = True
+        close = idx + 1
+        while True:
+            close = line.find(char, close)
+            if close == -1:
+                close = length
+                break
+            backslashes = 0
+            while line[close - 1 - backslashes] == '\\':
+                backslashes += 1
+            if backslashes % 2 == 0:
+                break
+            close += 1
+        pos = close + 1
+
+    return touches_triple, has_code, in_triple
+
+
+def _analyze_python(lines: Iterable[str]) -> Tuple[int, int, int, int]:
+    """Return (total_lines, code_lines, comment_lines, complexity) in one pass.
+
+    Lines are consumed as a stream and must keep their line endings.
+    Triple-quoted strings are tracked across lines, so docstring lines
+    count as comments and never as code.
+    """
+    total_lines = 1
+    code_lines = 0
+    comment_lines = 0
+    complexity = 1
+    in_triple = None  # delimiter of the currently open triple-quoted string
+
+    for line in lines:
+        if line.endswith('\n'):
+            total_lines += 1
+
+        stripped = line.strip()
+        if not stripped:
+            if in_triple:
+                comment_lines += 1
+            continue
+
+        if in_triple is None and stripped.startswith('#'):
+            comment_lines += 1
+            continue
+
+        starts_in_string = in_triple is not None
+        touches_triple, has_code, in_triple = _scan_python_line(stripped, in_triple)
+
+        if touches_triple:
+            comment_lines += 1
+
+        if has_code:
+            code_lines += 1
+            if not starts_in_string and stripped.startswith(_PYTHON_COMPLEXITY_PREFIXES):
+                complexity += 1
+
+    return total_lines, code_lines, comment_lines, complexity
+
+
+@functools.lru_cache(maxsize=1024)
+def _analyze_file(file_path: str, mtime: float, language: str) -> Tuple[int, int, int, int]:
+    """Return (total_lines, code_lines, comment_lines, complexity) for a file.
+
+    Cached per (path, mtime) so re-analysing an unchanged file is free.
+    The file is streamed line by line, so memory stays bounded by the
+    longest line rather than the file size.
+    """
+    with open(file_path, 'rb', buffering=1 << 20) as f:
+        lines = (raw.decode('utf-8', 'ignore') for raw in f)
+        if language == 'Python':
+            return _analyze_python(lines)
+
+        total_lines = 1
+        code_lines = 0
+        for line in lines:
+            if line.endswith('\n'):
+                total_lines += 1
+            if line.strip():
+                code_lines += 1
+
+    return total_lines, code_lines, 0, 1
+
 
 class CodeAnalyzer:
     """Analyzes code and extracts metadata."""
@@ -28,28 +195,51 @@ class CodeAnalyzer:
         '.sh': 'Shell',
     }
     
+    # Larger files are usually generated or minified and are skipped
+    MAX_FILE_SIZE = 2_000_000
+    
     def __init__(self):
         pass
         
-    def find_files(self, directory: str) -> List[str]:
-        """Find all files in a directory tree."""
-        file_list = []
-        
-        # Common directories to exclude
+    def find_files(self, directory: str) -> Iterator[str]:
+        """Yield supported source files in a directory tree."""
+        # Common directories to exclude; hidden entries are always skipped
         exclude_dirs = {
-            '.git', '.github', 'node_modules', 'venv', '.venv',
-            '__pycache__', '.idea', '.vscode', 'build', 'dist',
+            'node_modules', 'venv', '__pycache__', 'build', 'dist',
         }
         
-        for root, dirs, files in os.walk(directory):
-            # Modify dirs in-place to exclude certain directories
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
+        pending = [directory]
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
             
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_list.append(file_path)
-                
-        return file_list
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.') or name in exclude_dirs:
+                        continue
+                    
+                    # Never follow links out of the tree being scanned
+                    if entry.is_symlink():
+                        continue
+                    
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    
+                    # Filter by extension before touching the file's stat
+                    if os.path.splitext(name)[1].lower() not in self.SUPPORTED_EXTENSIONS:
+                        continue
+                    
+                    try:
+                        if entry.stat(follow_symlinks=False).st_size > self.MAX_FILE_SIZE:
+                            continue
+                    except OSError:
+                        continue
+                    
+                    yield entry.path
     
     def is_supported_file(self, file_path: str) -> bool:
         """Determine if file type is supported for analysis."""
@@ -67,18 +257,18 @@ class CodeAnalyzer:
         language = self.get_file_language(file_path)
         
         try:
-            # Use libmagic to detect file type
-            mime_type = magic.from_file(file_path, mime=True)
+            # Known extensions map directly; use libmagic for anything else
+            mime_type = _EXT_TO_MIME.get(ext.lower())
+            if mime_type is None:
+                mime_type = magic.from_file(file_path, mime=True)
             
             # Get file stats
             stat_info = os.stat(file_path)
             
-            # Count lines of code
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                lines = content.count('\n') + 1
-                code_lines = self._count_code_lines(content, language)
-                comment_lines = self._count_comment_lines(content, language)
+            # Count lines of code, comments and complexity in one pass
+            lines, code_lines, comment_lines, complexity = _analyze_file(
+                file_path, stat_info.st_mtime, language
+            )
                 
             return {
                 'file_path': file_path,
@@ -91,7 +281,7 @@ class CodeAnalyzer:
                 'total_lines': lines,
                 'code_lines': code_lines,
                 'comment_lines': comment_lines,
-                'complexity_estimate': self._estimate_complexity(content, language)
+                'complexity_estimate': complexity
             }
         except Exception as e:
             return {
@@ -102,37 +292,16 @@ class CodeAnalyzer:
     def _count_code_lines(self, content: str, language: str) -> int:
         """Count non-empty, non-comment lines of code."""
         if language == 'Python':
-            # Remove multi-line strings
-            content = re.sub(r'""".*?"""', '', content, flags=re.DOTALL)
-            content = re.sub(r"'''.*?'''", '', content, flags=re.DOTALL)
-            
-            # Remove single line comments
-            lines = [line for line in content.split('\n') 
-                    if line.strip() and not line.strip().startswith('#')]
-            
-            return len(lines)
+            return _analyze_python(content.splitlines(True))[1]
             
         # Add other language cases here
         # Default implementation
-        lines = [line for line in content.split('\n') if line.strip()]
-        return len(lines)
+        return sum(1 for line in content.splitlines() if line.strip())
     
     def _count_comment_lines(self, content: str, language: str) -> int:
         """Count comment lines."""
         if language == 'Python':
-            # Count single line comments
-            single_comments = len([line for line in content.split('\n') 
-                                if line.strip().startswith('#')])
-            
-            # Count multi-line comments
-            multi_comments = 0
-            multi_regions = re.findall(r'""".*?"""', content, flags=re.DOTALL)
-            multi_regions.extend(re.findall(r"'''.*?'''", content, flags=re.DOTALL))
-            
-            for region in multi_regions:
-                multi_comments += region.count('\n') + 1
-                
-            return single_comments + multi_comments
+            return _analyze_python(content.splitlines(True))[2]
             
         # Add other language cases here
         # Default implementation
@@ -140,21 +309,8 @@ class CodeAnalyzer:
     
     def _estimate_complexity(self, content: str, language: str) -> int:
         """Estimate code complexity based on language-specific indicators."""
-        complexity = 1
-        
         if language == 'Python':
-            # Count decision points
-            complexity += content.count('if ') 
-            complexity += content.count('elif ') 
-            complexity += content.count('else:') 
-            complexity += content.count('for ') 
-            complexity += content.count('while ') 
-            complexity += content.count('try:') 
-            complexity += content.count('except ') 
-            complexity += content.count('with ') 
-            # Count classes and functions
-            complexity += len(re.findall(r'def\s+\w+\s*\(', content))
-            complexity += len(re.findall(r'class\s+\w+\s*', content))
+            return _analyze_python(content.splitlines(True))[3]
             
         # Add other language cases here
-        return complexity
\ No newline at end of file
+        return 1
\ No newline at end of file
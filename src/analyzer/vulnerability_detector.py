@@ -2,13 +2,23 @@ import ast
 import re
 import os
 import subprocess
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 # Import built-in static analyzers
 import bandit
 # from pylint import epylint as lint
 from pylint import lint
 
+# Hyperscan is optional (x86-64 only); without it every pattern runs on every file
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Python's \s also matches the \x1c-\x1f separators, which Hyperscan's
+# Unicode \s does not, so the prefilter sees them as spaces
+_PREFILTER_SPACES = bytes.maketrans(b'\x1c\x1d\x1e\x1f', b'    ')
+
 class VulnerabilityDetector:
     """Detects security vulnerabilities in code."""
     
@@ -59,6 +69,24 @@ class VulnerabilityDetector:
             'weak_crypto': 'medium',
             'insecure_random': 'medium',
         }
+        
+        # Compile patterns once into (vuln_type, pattern) lists per language;
+        # list positions double as Hyperscan pattern ids
+        self.compiled_patterns = {
+            language: [
+                (vuln_type, re.compile(pattern))
+                for vuln_type, patterns in vuln_patterns.items()
+                for pattern in patterns
+            ]
+            for language, vuln_patterns in self.patterns.items()
+        }
+        
+        # Per-language Hyperscan databases used to prefilter files
+        self.prefilters = {}
+        if hyperscan is not None:
+            for language, entries in self.compiled_patterns.items():
+                if entries:
+                    self.prefilters[language] = self._build_prefilter(entries)
     
     def scan_file(self, file_path: str) -> List[Dict[str, Any]]:
         """Scan a file for vulnerabilities."""
@@ -102,27 +130,67 @@ class VulnerabilityDetector:
         }
         return extension_map.get(ext.lower())
     
+    def _build_prefilter(self, entries: List[Tuple[str, re.Pattern]]) -> Optional[Any]:
+        """Compile patterns into one Hyperscan database in prefilter mode.
+        
+        Prefilter mode accepts constructs Hyperscan cannot match exactly
+        (such as lookaheads) by matching a superset, so any hit must still
+        be confirmed with the original regex. UTF-8 and UCP mode give \s
+        and . the same Unicode meaning they have for re on str, so the
+        superset never drops a line re would report.
+        """
+        database = hyperscan.Database()
+        try:
+            database.compile(
+                expressions=[pattern.pattern.encode('utf-8') for _, pattern in entries],
+                ids=list(range(len(entries))),
+                elements=len(entries),
+                flags=[
+                    hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH
+                    | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+                ] * len(entries),
+            )
+        except hyperscan.error as e:
+            print(f"Hyperscan compilation failed, scanning without prefilter: {str(e)}")
+            return None
+        return database
+    
+    def _candidate_patterns(self, content: str, language: str) -> List[Tuple[str, re.Pattern]]:
+        """Return the patterns that may match content, in declaration order."""
+        entries = self.compiled_patterns.get(language, [])
+        prefilter = self.prefilters.get(language)
+        if prefilter is None:
+            return entries
+        
+        # One DFA pass over the file finds which patterns could match at all
+        hits = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            hits.add(pattern_id)
+        
+        prefilter.scan(content.encode('utf-8').translate(_PREFILTER_SPACES), match_event_handler=on_match)
+        return [entries[i] for i in sorted(hits)]
+    
     def _pattern_scan(self, content: str, language: str, file_path: str) -> List[Dict[str, Any]]:
         """Scan content using regex patterns."""
         vulnerabilities = []
         
-        for vuln_type, patterns in self.patterns.get(language, {}).items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    line_num = content[:match.start()].count('\n') + 1
-                    line_content = content.split('\n')[line_num - 1]
-                    
-                    vulnerabilities.append({
-                        'file_path': file_path,
-                        'line': line_num,
-                        'column': match.start() - content.rfind('\n', 0, match.start()) - 1,
-                        'type': vuln_type,
-                        'risk_level': self.risk_levels.get(vuln_type, 'low'),
-                        'description': f"Potential {vuln_type.replace('_', ' ')} vulnerability detected",
-                        'code_snippet': line_content.strip(),
-                        'confidence': 'medium',  # Pattern-based detection has medium confidence
-                    })
+        for vuln_type, pattern in self._candidate_patterns(content, language):
+            matches = pattern.finditer(content)
+            for match in matches:
+                line_num = content[:match.start()].count('\n') + 1
+                line_content = content.split('\n')[line_num - 1]
+                
+                vulnerabilities.append({
+                    'file_path': file_path,
+                    'line': line_num,
+                    'column': match.start() - content.rfind('\n', 0, match.start()) - 1,
+                    'type': vuln_type,
+                    'risk_level': self.risk_levels.get(vuln_type, 'low'),
+                    'description': f"Potential {vuln_type.replace('_', ' ')} vulnerability detected",
+                    'code_snippet': line_content.strip(),
+                    'confidence': 'medium',  # Pattern-based detection has medium confidence
+                })
         
         return vulnerabilities
     
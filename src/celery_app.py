@@ -0,0 +1,7 @@
+from celery import Celery
+
+from src.storage import REDIS_URL
+
+# The API only queues tasks by name, so it can share this app without
+# importing the scanner stack that src.tasks registers on it
+celery_app = Celery('codeguardian', broker=REDIS_URL)
@@ -1,7 +1,9 @@
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional
 from datetime import datetime
 import collections
-import statistics
+import functools
+import heapq
+import operator
 
 class StatsGenerator:
     """Generates statistics and visualizations for dashboard."""
@@ -9,42 +11,70 @@ class StatsGenerator:
     def __init__(self):
         pass
     
-    def generate(self, vulnerabilities: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def generate(self, vulnerabilities: List[Dict[str, Any]], now_iso: Optional[str] = None) -> Dict[str, Any]:
         """Generate statistics from vulnerabilities."""
-        if not vulnerabilities:
-            return self._empty_stats()
-        
-        # Count vulnerabilities by risk level
-        risk_levels = [v.get('risk_level', 'unknown').lower() for v in vulnerabilities]
-        risk_counts = dict(collections.Counter(risk_levels))
+        return self.from_aggregate(self.aggregate(vulnerabilities), now_iso=now_iso)
+    
+    def aggregate(self, vulnerabilities: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Reduce vulnerabilities to mergeable counters.
         
-        # Count vulnerabilities by type
-        vuln_types = [v.get('type', 'unknown').lower() for v in vulnerabilities]
-        type_counts = dict(collections.Counter(vuln_types))
+        Aggregates from separate scans can be summed field by field, which
+        lets the dashboard keep running totals instead of raw findings.
+        """
+        risk_counts = collections.Counter()
+        type_counts = collections.Counter()
+        file_counts = collections.Counter()
+        confidence_sum = 0.0
         
-        # Top 5 most common vulnerability types
-        top_types = sorted(type_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        # Count risk levels, types and files in a single pass
+        for v in vulnerabilities:
+            risk_counts[v.get('risk_level', 'unknown').lower()] += 1
+            type_counts[v.get('type', 'unknown').lower()] += 1
+            file_counts[v.get('file_path', 'unknown')] += 1
+            
+            # Non-numeric confidences (e.g. 'medium') count as 0
+            confidence = v.get('confidence', 0)
+            if isinstance(confidence, (int, float)):
+                confidence_sum += confidence
         
-        # Calculate average confidence
-        confidences = [float(v.get('confidence', 0)) if isinstance(v.get('confidence', 0), (int, float)) else 0 
-                       for v in vulnerabilities]
-        avg_confidence = statistics.mean(confidences) if confidences else 0
+        return {
+            'total': len(vulnerabilities),
+            'confidence_sum': confidence_sum,
+            'risk': risk_counts,
+            'type': type_counts,
+            'file': file_counts,
+        }
+    
+    def from_aggregate(self, aggregate: Dict[str, Any], now_iso: Optional[str] = None) -> Dict[str, Any]:
+        """Generate statistics from counters built by aggregate().
         
-        # Files with most vulnerabilities
-        file_counts = collections.Counter([v.get('file_path', 'unknown') for v in vulnerabilities])
-        top_files = sorted(file_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        now_iso lets callers that already hold the current time in ISO
+        format reuse it for 'generated_at'.
+        """
+        total = aggregate['total']
+        if not total:
+            return self._empty_stats(now_iso)
         
         return {
-            'total_vulnerabilities': len(vulnerabilities),
-            'risk_distribution': risk_counts,
-            'type_distribution': type_counts,
-            'top_vulnerability_types': dict(top_types),
-            'average_confidence': avg_confidence,
-            'top_vulnerable_files': dict(top_files),
-            'generated_at': datetime.now().isoformat()
+            'total_vulnerabilities': total,
+            'risk_distribution': dict(aggregate['risk']),
+            'type_distribution': dict(aggregate['type']),
+            'top_vulnerability_types': self._top_counts(aggregate['type']),
+            'average_confidence': aggregate['confidence_sum'] / total,
+            'top_vulnerable_files': self._top_counts(aggregate['file']),
+            'generated_at': now_iso or datetime.now().isoformat()
         }
     
-    def _empty_stats(self) -> Dict[str, Any]:
+    def _top_counts(self, counts: Dict[str, int], n: int = 5) -> Dict[str, int]:
+        """Return the n largest counts, keeping first-seen order for ties.
+        
+        heapq.nlargest is O(N log n) and works on any mapping, so large
+        per-file aggregates are neither sorted in full nor copied into a
+        Counter first.
+        """
+        return dict(heapq.nlargest(n, counts.items(), key=operator.itemgetter(1)))
+    
+    def _empty_stats(self, now_iso: Optional[str] = None) -> Dict[str, Any]:
         """Return empty statistics."""
         return {
             'total_vulnerabilities': 0,
@@ -53,7 +83,7 @@ class StatsGenerator:
             'top_vulnerability_types': {},
             'average_confidence': 0,
             'top_vulnerable_files': {},
-            'generated_at': datetime.now().isoformat()
+            'generated_at': now_iso or datetime.now().isoformat()
         }
     
     def calculate_risk_score(self, vulnerabilities: List[Dict[str, Any]]) -> float:
@@ -88,8 +118,21 @@ class StatsGenerator:
         normalized_score = min(100, 100 * math.log(1 + total_weight / max_reasonable_weight) / math.log(2))
         return round(normalized_score, 1)
     
-    def generate_trend_data(self, scan_ids: List[str], scan_results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate trend data for multiple scans."""
+    def trend_point(self, scan_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize a completed scan as a single trend data point."""
+        risk_counts = scan_result.get('stats', {}).get('risk_distribution', {})
+        return {
+            'scan_id': scan_result.get('scan_id'),
+            'timestamp': scan_result.get('timestamp', ''),
+            'critical': risk_counts.get('critical', 0),
+            'high': risk_counts.get('high', 0),
+            'medium': risk_counts.get('medium', 0),
+            'low': risk_counts.get('low', 0),
+            'risk_score': scan_result.get('risk_score', 0),
+        }
+    
+    def generate_trend_data(self, trend_points: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Generate trend data from per-scan points built by trend_point()."""
         trend_data = {
             'dates': [],
             'critical': [],
@@ -99,27 +142,17 @@ class StatsGenerator:
             'risk_scores': []
         }
         
-        for scan_id in scan_ids:
-            if scan_id not in scan_results:
-                continue
-                
-            result = scan_results[scan_id]
-            timestamp = result.get('timestamp', '')
-            vulns = result.get('vulnerabilities', [])
-            
-            # Count vulnerabilities by risk level
-            risk_levels = [v.get('risk_level', 'unknown').lower() for v in vulns]
-            risk_counts = collections.Counter(risk_levels)
-            
-            # Add data points
-            trend_data['dates'].append(timestamp)
-            trend_data['critical'].append(risk_counts.get('critical', 0))
-            trend_data['high'].append(risk_counts.get('high', 0))
-            trend_data['medium'].append(risk_counts.get('medium', 0))
-            trend_data['low'].append(risk_counts.get('low', 0))
-            
-            # Add risk score
-            risk_score = result.get('risk_score', 0)
-            trend_data['risk_scores'].append(risk_score)
+        for point in trend_points:
+            trend_data['dates'].append(point['timestamp'])
+            trend_data['critical'].append(point['critical'])
+            trend_data['high'].append(point['high'])
+            trend_data['medium'].append(point['medium'])
+            trend_data['low'].append(point['low'])
+            trend_data['risk_scores'].append(point['risk_score'])
         
-        return trend_data
\ No newline at end of file
+        return trend_data
+
+# Built once per process and shared by the API and the scan tasks
+@functools.lru_cache(maxsize=1)
+def get_stats_generator() -> StatsGenerator:
+    return StatsGenerator()
@@ -1,5 +1,12 @@
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+# RE2 matches in linear time, so hostile snippets cannot trigger
+# catastrophic backtracking; fall back to re where it isn't installed
+try:
+    import re2
+except ImportError:
+    re2 = re
 
 class FixGenerator:
     """Generates intelligent code fixes for detected vulnerabilities."""
@@ -18,7 +25,9 @@ class FixGenerator:
                 'explanation': "Avoid shell commands with concatenated user input."
             },
             'hardcoded_secrets': {
-                'pattern': r'(\w+)\s*=\s*[\'"]((?!.*\$\{)(?!.*\{\{).+?)[\'"]\s*',
+                'pattern': r'(\w+)\s*=\s*[\'"](.+?)[\'"]\s*',
+                # Template placeholders are not secrets (RE2 has no lookahead)
+                'excluded_values': ('${', '{{'),
                 'replacement': "{} = os.environ.get('{}', '')",
                 'explanation': "Store secrets in environment variables or a secure vault service."
             },
@@ -28,6 +37,10 @@ class FixGenerator:
                 'explanation': "Pickle is vulnerable to code execution attacks with untrusted data."
             }
         }
+        
+        # Compile template patterns once instead of on every vulnerability
+        for template in self.fix_templates.values():
+            template['compiled'] = re2.compile(template['pattern'])
     
     def generate_fix(self, vulnerability: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Generate a fix for a vulnerability."""
@@ -44,14 +57,29 @@ class FixGenerator:
         # If no exact match, try type-based fixes
         return self._generate_type_based_fix(vulnerability)
     
+    def generate_fix_batch(self, vulnerabilities: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Generate fixes for many vulnerabilities.
+        
+        Fixes depend only on the type and code snippet, so findings that
+        repeat both (e.g. the same line flagged by several detectors) are
+        generated once.
+        """
+        fixes = {}
+        results = []
+        for vulnerability in vulnerabilities:
+            key = (vulnerability.get('type', '').lower(), vulnerability.get('code_snippet', ''))
+            if key not in fixes:
+                fixes[key] = self.generate_fix(vulnerability)
+            results.append(fixes[key])
+        return results
+    
     def _apply_template(self, template: Dict[str, str], code_snippet: str) -> Optional[Dict[str, Any]]:
         """Apply a fix template to a code snippet."""
         try:
-            pattern = template['pattern']
             replacement_template = template['replacement']
             explanation = template['explanation']
             
-            match = re.search(pattern, code_snippet)
+            match = self._search(template, code_snippet)
             if not match:
                 return None
                 
@@ -85,6 +113,21 @@ class FixGenerator:
             print(f"Fix template application error: {str(e)}")
             return None
     
+    def _search(self, template: Dict[str, Any], code_snippet: str):
+        """Return the first template match whose value, up to the end of
+        its line, contains none of the template's excluded values."""
+        excluded_values = template.get('excluded_values')
+        if not excluded_values:
+            return template['compiled'].search(code_snippet)
+        
+        for match in template['compiled'].finditer(code_snippet):
+            value_start = match.start(2)
+            line_end = code_snippet.find('\n', value_start)
+            rest_of_line = code_snippet[value_start:] if line_end == -1 else code_snippet[value_start:line_end]
+            if not any(excluded in rest_of_line for excluded in excluded_values):
+                return match
+        return None
+    
     def _generate_type_based_fix(self, vulnerability: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a fix based on vulnerability type."""
         vuln_type = vulnerability.get('type', '').lower()
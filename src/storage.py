@@ -0,0 +1,65 @@
+import os
+import time
+from typing import List, Tuple
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+# Scan state and results expire from Redis after a day
+SCAN_TTL_SECONDS = 86400
+
+# Dashboard totals and trends cover the last 30 UTC days of scans
+TREND_WINDOW_DAYS = 30
+
+# Daily aggregates outlive the window by a day, then expire
+AGG_TTL_SECONDS = (TREND_WINDOW_DAYS + 1) * 86400
+
+def scan_key(scan_id: str) -> str:
+    """Redis hash holding a scan's status and metadata"""
+    return f"scan:{scan_id}"
+
+def result_key(scan_id: str) -> str:
+    """Redis string holding a completed scan's JSON results"""
+    return f"result:{scan_id}"
+
+def user_scans_key(username: str) -> str:
+    """Redis sorted set of scan IDs requested by a user, scored by start time"""
+    return f"user:{username}:recent_scans"
+
+def user_agg_key(username: str, day: str, counter: str = "") -> str:
+    """Redis key of a user's totals for one UTC day, or of one of its counters
+    
+    The bare key is a hash of scalar totals (scans, total, confidence_sum);
+    risk and type counts live in their own hashes, and file counts in a
+    sorted set so the dashboard can read back only the top files.
+    """
+    key = f"user:{username}:agg:{day}"
+    return f"{key}:{counter}" if counter else key
+
+def user_top_files_key(username: str) -> str:
+    """Scratch sorted set the dashboard merges a user's daily file counts into"""
+    return f"user:{username}:top_files"
+
+def user_trend_key(username: str) -> str:
+    """Redis sorted set of per-scan trend points scored by completion time"""
+    return f"user:{username}:trend"
+
+def agg_day(timestamp: float) -> str:
+    """UTC day (YYYY-MM-DD) whose aggregates a scan completed at timestamp counts towards"""
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+def trend_window(now: float) -> Tuple[float, List[str]]:
+    """Start time and daily aggregate buckets of the dashboard window ending at now
+    
+    The window spans whole UTC days, so the summed daily totals and the
+    trend points always describe the same scans.
+    """
+    start = now - now % 86400 - (TREND_WINDOW_DAYS - 1) * 86400
+    return start, [agg_day(start + day * 86400) for day in range(TREND_WINDOW_DAYS)]
+
+def repo_cache_key(host: str) -> str:
+    """Redis hash of the size in bytes of each cached checkout on one worker host"""
+    return f"repo_cache:{host}"
+
+def repo_lock_key(host: str, repo_id: str) -> str:
+    """Redis lock serializing use of a cached checkout on one worker host"""
+    return f"lock:repo:{host}:{repo_id}"
\ No newline at end of file
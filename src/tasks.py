@@ -0,0 +1,344 @@
+import os
+import contextlib
+import functools
+import hashlib
+import multiprocessing
+import shutil
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Iterable, List, Dict, Any, Optional
+
+import orjson
+import redis
+from redis.exceptions import LockError
+from redis.lock import Lock
+from pygit2 import GitError, Repository, init_repository
+from pygit2.enums import CheckoutStrategy
+
+from src.analyzer.code_analyzer import CodeAnalyzer
+from src.analyzer.vulnerability_detector import VulnerabilityDetector
+from src.ml.vulnerability_classifier import VulnerabilityClassifier
+from src.ml.fix_generator import FixGenerator
+from src.dashboard.stats_generator import get_stats_generator
+from src.celery_app import celery_app
+from src.storage import (
+    REDIS_URL, SCAN_TTL_SECONDS, AGG_TTL_SECONDS,
+    scan_key, result_key, user_agg_key, user_trend_key, repo_cache_key, repo_lock_key,
+    agg_day, trend_window,
+)
+
+redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+# Checkouts are cached per repository URL and reused by later scans
+REPO_CACHE_DIR = os.environ.get("REPO_CACHE_DIR", "/var/cache/codeguardian")
+REPO_CACHE_MAX_BYTES = int(os.environ.get("REPO_CACHE_MAX_BYTES", 10 * 1024 ** 3))
+
+# A checkout lock expires this long after its scan stops renewing it,
+# e.g. because the worker died; running scans renew it every third of it
+REPO_LOCK_TIMEOUT = 300
+
+# Components are built once per process and shared by every scan
+@functools.lru_cache(maxsize=1)
+def get_code_analyzer() -> CodeAnalyzer:
+    return CodeAnalyzer()
+
+@functools.lru_cache(maxsize=1)
+def get_vuln_detector() -> VulnerabilityDetector:
+    return VulnerabilityDetector()
+
+@functools.lru_cache(maxsize=1)
+def get_vuln_classifier() -> VulnerabilityClassifier:
+    return VulnerabilityClassifier()
+
+@functools.lru_cache(maxsize=1)
+def get_fix_generator() -> FixGenerator:
+    return FixGenerator()
+
+def _scan_one(file_path: str) -> List[dict]:
+    """Scan a single file for vulnerabilities"""
+    return get_vuln_detector().scan_file(file_path)
+
+# One process pool per worker, shared by every scan it runs
+_scan_pool = None
+_scan_pool_lock = threading.Lock()
+
+def get_scan_pool() -> ProcessPoolExecutor:
+    """Return the worker's scan pool, starting it on first use"""
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is None:
+            # Scans run on Celery threads; forking one of them could copy a lock
+            # another thread holds, so children start from a forkserver instead
+            # and each builds its own detector once
+            _scan_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=get_vuln_detector,
+            )
+        return _scan_pool
+
+def _run_pool(file_paths: Iterable[str]) -> List[dict]:
+    """Scan files in parallel across all CPU cores"""
+    global _scan_pool
+    executor = get_scan_pool()
+    
+    vulnerabilities = []
+    try:
+        for file_vulns in executor.map(_scan_one, file_paths, chunksize=16):
+            vulnerabilities.extend(file_vulns)
+    except BrokenProcessPool:
+        # A pool child died; start a fresh pool for the next scan
+        with _scan_pool_lock:
+            if _scan_pool is executor:
+                _scan_pool = None
+        raise
+    return vulnerabilities
+
+def _enrich(vulnerabilities: List[dict]) -> List[dict]:
+    """Attach classification and suggested fix to every finding in one batch"""
+    classifications = get_vuln_classifier().classify_batch(vulnerabilities)
+    suggested_fixes = get_fix_generator().generate_fix_batch(vulnerabilities)
+    
+    return [
+        {
+            **vuln,
+            "classification": classification,
+            "suggested_fix": suggested_fix
+        }
+        for vuln, classification, suggested_fix in zip(vulnerabilities, classifications, suggested_fixes)
+    ]
+
+def _store_results(scan_id: str, username: str, results: Dict[str, Any], aggregate: Dict[str, Any]):
+    """Persist scan results, mark the scan completed and update user totals"""
+    now = time.time()
+    day = agg_day(now)
+    window_start, _ = trend_window(now)
+    trend_point = get_stats_generator().trend_point(results)
+    
+    with redis_client.pipeline() as pipe:
+        pipe.set(result_key(scan_id), orjson.dumps(results), ex=SCAN_TTL_SECONDS)
+        pipe.hset(scan_key(scan_id), mapping={
+            "status": "completed",
+            "completed_at": results["timestamp"],
+        })
+        pipe.expire(scan_key(scan_id), SCAN_TTL_SECONDS)
+        
+        # Merge this scan into the user's dashboard totals for today
+        agg_key = user_agg_key(username, day)
+        pipe.hincrby(agg_key, "scans", 1)
+        pipe.hincrby(agg_key, "total", aggregate['total'])
+        pipe.hincrbyfloat(agg_key, "confidence_sum", aggregate['confidence_sum'])
+        for counter in ('risk', 'type'):
+            for field, count in aggregate[counter].items():
+                pipe.hincrby(user_agg_key(username, day, counter), field, count)
+        for file_path, count in aggregate['file'].items():
+            pipe.zincrby(user_agg_key(username, day, 'file'), count, file_path)
+        for counter in ('', 'risk', 'type', 'file'):
+            pipe.expire(user_agg_key(username, day, counter), AGG_TTL_SECONDS)
+        
+        # Record the trend point and drop points outside the trend window
+        trend_key = user_trend_key(username)
+        pipe.zadd(trend_key, {orjson.dumps(trend_point): now})
+        pipe.zremrangebyscore(trend_key, "-inf", f"({window_start}")
+        pipe.expire(trend_key, AGG_TTL_SECONDS)
+        pipe.execute()
+
+def _repo_lock(repo_id: str) -> Lock:
+    """Lock guarding a cached checkout on this host"""
+    # Not thread-local, so the heartbeat thread can renew the scan's lock
+    return redis_client.lock(
+        repo_lock_key(socket.gethostname(), repo_id),
+        timeout=REPO_LOCK_TIMEOUT,
+        thread_local=False,
+    )
+
+@contextlib.contextmanager
+def _hold_repo_lock(repo_id: str):
+    """Hold a checkout's lock, renewing it for as long as the scan runs"""
+    lock = _repo_lock(repo_id)
+    lock.acquire()
+    stopped = threading.Event()
+    
+    def heartbeat():
+        while not stopped.wait(REPO_LOCK_TIMEOUT / 3):
+            try:
+                lock.reacquire()
+            except LockError as e:
+                print(f"Lost lock on checkout {repo_id}: {str(e)}")
+                return
+    
+    thread = threading.Thread(target=heartbeat, name=f"repo-lock-{repo_id}", daemon=True)
+    thread.start()
+    try:
+        yield lock
+    finally:
+        stopped.set()
+        thread.join()
+        lock.release()
+
+def _default_branch(remote) -> str:
+    """Branch the remote's HEAD points to, as git clone checks out without --branch"""
+    for head in remote.ls_remotes():
+        if head['name'] == 'HEAD' and head['symref_target']:
+            return head['symref_target'][len('refs/heads/'):]
+    raise ValueError("Remote repository has no default branch")
+
+def _fetch_branch(repo: Repository, branch: Optional[str], depth: int):
+    """Fetch one branch (the default branch if None) without tags and check
+    its tip out over the working tree"""
+    # Like git's --single-branch --no-tags: only the branch is fetched and
+    # tags pointing at fetched commits are not followed
+    repo.config["remote.origin.tagopt"] = "--no-tags"
+    remote = repo.remotes["origin"]
+    if branch is None:
+        branch = _default_branch(remote)
+    remote_ref = f"refs/remotes/origin/{branch}"
+    remote.fetch([f"+refs/heads/{branch}:{remote_ref}"], depth=depth)
+    try:
+        commit = repo.lookup_reference(remote_ref).peel()
+    except KeyError:
+        raise ValueError(f"Branch '{branch}' not found in the repository")
+    repo.checkout_tree(commit, strategy=CheckoutStrategy.FORCE | CheckoutStrategy.REMOVE_UNTRACKED)
+    repo.set_head(commit.id)
+
+def _open_checkout(repo_dir: str) -> Optional[Repository]:
+    """Open a cached checkout, or return None if there is no usable one"""
+    if not os.path.isdir(os.path.join(repo_dir, '.git')):
+        return None
+    
+    try:
+        repo = Repository(repo_dir)
+        repo.lookup_reference("HEAD")
+        repo.remotes["origin"]
+        return repo
+    except (GitError, KeyError) as e:
+        # An interrupted clone or corrupt checkout would otherwise fail every
+        # scan of this repository; it is replaced with a fresh clone
+        print(f"Recloning unusable checkout {repo_dir}: {str(e)}")
+        return None
+
+def _checkout_repository(repo_url: str, repo_dir: str, branch: Optional[str], depth: int):
+    """Clone a repository into repo_dir, or update an existing clone to the branch tip"""
+    repo = _open_checkout(repo_dir)
+    if repo is not None:
+        # Later scans only fetch the branch tip and check it out over the old tree.
+        # Network errors or a missing branch fail the scan but keep the checkout.
+        _fetch_branch(repo, branch, depth)
+        return
+    
+    # First scan of this repository: shallow single-branch clone in-process with libgit2
+    shutil.rmtree(repo_dir, ignore_errors=True)
+    try:
+        repo = init_repository(repo_dir)
+        repo.remotes.create("origin", repo_url, f"+refs/heads/{branch}:refs/remotes/origin/{branch}" if branch else None)
+        _fetch_branch(repo, branch, depth)
+    except Exception:
+        shutil.rmtree(repo_dir, ignore_errors=True)
+        raise
+
+def _dir_size(path: str) -> int:
+    """Total size in bytes of the files under path"""
+    total = 0
+    pending = [path]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+def _evict_repo_cache():
+    """Delete least recently used checkouts until the cache fits REPO_CACHE_MAX_BYTES"""
+    # Sizes are recorded after each checkout, so the cache is never walked here
+    sizes_key = repo_cache_key(socket.gethostname())
+    sizes = {repo_id: int(size) for repo_id, size in redis_client.hgetall(sizes_key).items()}
+    total_size = sum(sizes.values())
+    if total_size <= REPO_CACHE_MAX_BYTES:
+        return
+    
+    cached = []
+    for repo_id, size in sizes.items():
+        try:
+            cached.append((os.stat(os.path.join(REPO_CACHE_DIR, repo_id)).st_mtime, repo_id, size))
+        except FileNotFoundError:
+            redis_client.hdel(sizes_key, repo_id)
+            total_size -= size
+    
+    for _, repo_id, size in sorted(cached):
+        if total_size <= REPO_CACHE_MAX_BYTES:
+            break
+        
+        # Skip checkouts another scan is using right now
+        lock = _repo_lock(repo_id)
+        if not lock.acquire(blocking=False):
+            continue
+        try:
+            shutil.rmtree(os.path.join(REPO_CACHE_DIR, repo_id), ignore_errors=True)
+            redis_client.hdel(sizes_key, repo_id)
+        finally:
+            lock.release()
+        total_size -= size
+
+@celery_app.task(name='execute_scan', ignore_result=True)
+def execute_scan_task(scan_id: str, repo_url: str, branch: Optional[str], depth: int, scan_type: str, username: str):
+    """Check out a repository, scan it and store the results in Redis"""
+    # Each repository URL gets a persistent checkout directory
+    repo_id = hashlib.blake2b(repo_url.encode(), digest_size=16).hexdigest()
+    repo_dir = os.path.join(REPO_CACHE_DIR, repo_id)
+    
+    try:
+        os.makedirs(REPO_CACHE_DIR, exist_ok=True)
+        
+        # Quick scans only need the tip
+        if scan_type == "quick":
+            depth = 1
+        
+        # Shared components
+        code_analyzer = get_code_analyzer()
+        stats_generator = get_stats_generator()
+        
+        # Concurrent scans of the same repository take turns with its checkout
+        with _hold_repo_lock(repo_id):
+            _checkout_repository(repo_url, repo_dir, branch, depth or 1)
+            os.utime(repo_dir)  # mark as recently used for cache eviction
+            redis_client.hset(repo_cache_key(socket.gethostname()), repo_id, _dir_size(repo_dir))
+            
+            # Analyze code in a process pool, scanning while the tree is walked
+            vulnerabilities = _run_pool(code_analyzer.find_files(repo_dir))
+        
+        # Classify and enhance vulnerability data
+        vulnerabilities = _enrich(vulnerabilities)
+        
+        # Generate statistics
+        now_iso = datetime.now().isoformat()
+        aggregate = stats_generator.aggregate(vulnerabilities)
+        stats = stats_generator.from_aggregate(aggregate, now_iso=now_iso)
+        risk_score = stats_generator.calculate_risk_score(vulnerabilities)
+        
+        # Store results
+        _store_results(scan_id, username, {
+            "scan_id": scan_id,
+            "timestamp": now_iso,
+            "vulnerabilities": vulnerabilities,
+            "stats": stats,
+            "risk_score": risk_score,
+        }, aggregate)
+        
+    except Exception as e:
+        with redis_client.pipeline() as pipe:
+            pipe.hset(scan_key(scan_id), mapping={"status": "failed", "error": str(e)})
+            pipe.expire(scan_key(scan_id), SCAN_TTL_SECONDS)
+            pipe.execute()
+        raise
+    
+    # Keep the cache within its size budget
+    try:
+        _evict_repo_cache()
+    except OSError as e:
+        print(f"Error evicting repository cache: {str(e)}")
\ No newline at end of file
@@ -1,5 +1,6 @@
 import unittest
 import os
+import shutil
 import tempfile
 from src.analyzer.code_analyzer import CodeAnalyzer
 from src.analyzer.vulnerability_detector import VulnerabilityDetector
@@ -42,14 +43,72 @@ password = "hardcoded_secret123"  # Hardcoded secret
         shutil.rmtree(self.temp_dir)
     
     def test_find_files(self):
-        files = self.code_analyzer.find_files(self.temp_dir)
+        files = list(self.code_analyzer.find_files(self.temp_dir))
         self.assertEqual(len(files), 1)
         self.assertTrue(files[0].endswith("sample.py"))
+
+    def test_find_files_skips_excluded_entries(self):
+        for dirname in (".git", "node_modules", "src"):
+            os.makedirs(os.path.join(self.temp_dir, dirname))
+            with open(os.path.join(self.temp_dir, dirname, "module.py"), "w") as f:
+                f.write("x = 1\n")
+        with open(os.path.join(self.temp_dir, "notes.txt"), "w") as f:
+            f.write("not source\n")
+        with open(os.path.join(self.temp_dir, "bundle.js"), "w") as f:
+            f.write("x" * (self.code_analyzer.MAX_FILE_SIZE + 1))
+
+        # Links to files and directories outside the tree are not followed
+        outside_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outside_dir)
+        with open(os.path.join(outside_dir, "secret.py"), "w") as f:
+            f.write("password = 'outside'\n")
+        os.symlink(os.path.join(outside_dir, "secret.py"), os.path.join(self.temp_dir, "leak.py"))
+        os.symlink(outside_dir, os.path.join(self.temp_dir, "linked_dir"))
+
+        files = sorted(self.code_analyzer.find_files(self.temp_dir))
+        self.assertEqual(
+            files,
+            sorted([self.python_file, os.path.join(self.temp_dir, "src", "module.py")])
+        )
     
     def test_is_supported_file(self):
         self.assertTrue(self.code_analyzer.is_supported_file(self.python_file))
         self.assertFalse(self.code_analyzer.is_supported_file("nonexistent.xyz"))
-    
+
+    def test_extract_file_metadata(self):
+        docstring_file = os.path.join(self.temp_dir, "documented.py")
+        with open(docstring_file, "w") as f:
+            f.write('''"""Module docstring.
+
+Spans several lines.
+"""
+# A comment
+def greet(name):
+    """Say hello."""
+    if name:
+        return "hello " + name
+    return None
+''')
+
+        metadata = self.code_analyzer.extract_file_metadata(docstring_file)
+        self.assertEqual(metadata["language"], "Python")
+        self.assertEqual(metadata["code_lines"], 4)
+        self.assertEqual(metadata["comment_lines"], 6)
+        self.assertEqual(metadata["complexity_estimate"], 3)
+
+    def test_extract_file_metadata_quotes_outside_docstrings(self):
+        quotes_file = os.path.join(self.temp_dir, "quotes.py")
+        with open(quotes_file, "w") as f:
+            f.write("\n".join([
+                "delimiter = '\"\"\"'  # not a docstring",
+                'note = "see \'\'\' below"  # \'\'\'',
+                "value = 1",
+            ]) + "\n")
+
+        metadata = self.code_analyzer.extract_file_metadata(quotes_file)
+        self.assertEqual(metadata["code_lines"], 3)
+        self.assertEqual(metadata["comment_lines"], 0)
+
     def test_vulnerability_detection(self):
         vulnerabilities = self.vuln_detector.scan_file(self.python_file)
         
@@ -61,5 +120,15 @@ password = "hardcoded_secret123"  # Hardcoded secret
         self.assertTrue(any("command_injection" in t.lower() for t in vuln_types))
         self.assertTrue(any("hardcoded_secret" in t.lower() for t in vuln_types))
 
+    def test_vulnerability_detection_unicode_whitespace(self):
+        unicode_file = os.path.join(self.temp_dir, "unicode.py")
+        with open(unicode_file, "w", encoding="utf-8") as f:
+            f.write('password\u00a0= "hardcoded_secret123"\n')
+            f.write('os.system\x1c("echo " + user_input)\n')
+
+        vuln_types = {v["type"] for v in self.vuln_detector.scan_file(unicode_file)}
+        self.assertIn("hardcoded_secrets", vuln_types)
+        self.assertIn("command_injection", vuln_types)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
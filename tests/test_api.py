@@ -0,0 +1,35 @@
+import unittest
+import asyncio
+import os
+import orjson
+from unittest import mock
+
+os.environ.setdefault("JWT_SECRET", "test-secret-for-unit-tests-only-0123456789")
+
+from fastapi import HTTPException
+import main
+
+class TestScanStatus(unittest.TestCase):
+
+    def setUp(self):
+        # Redis holds one completed scan that belongs to alice
+        self.redis_client = mock.AsyncMock()
+        self.redis_client.hgetall.return_value = {"status": "completed", "requested_by": "alice"}
+        self.redis_client.get.return_value = b'{"scan_id": "scan-1"}'
+        patcher = mock.patch.object(main, "redis_client", self.redis_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_owner_gets_results(self):
+        response = asyncio.run(main.get_scan_status("scan-1", current_user=main.User(username="alice")))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(orjson.loads(response.body)["results"], {"scan_id": "scan-1"})
+
+    def test_other_user_gets_not_found(self):
+        with self.assertRaises(HTTPException) as context:
+            asyncio.run(main.get_scan_status("scan-1", current_user=main.User(username="bob")))
+        self.assertEqual(context.exception.status_code, 404)
+        self.redis_client.get.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import importlib.util
+import os
+import re
+import shutil
+import tempfile
+from unittest import mock
+import numpy as np
+from src.ml.vulnerability_classifier import VulnerabilityClassifier
+from src.ml.fix_generator import FixGenerator
+
+VULNERABILITIES = [
+    {"type": "sql_injection", "risk_level": "critical", "code_snippet": "cursor.execute('SELECT * FROM users WHERE id = ' + user_id)"},
+    {"type": "command_injection", "risk_level": "critical", "code_snippet": "os.system('echo ' + user_input)"},
+    {"type": "hardcoded_secrets", "risk_level": "medium", "code_snippet": "password = 'hardcoded_secret123'"},
+    {"type": "insecure_deserialization", "risk_level": "high", "code_snippet": "pickle.loads(data)"},
+    {"type": "sql_injection", "risk_level": "critical", "code_snippet": "cursor.execute('SELECT * FROM users WHERE id = ' + user_id)"},
+    {"type": "path_traversal", "risk_level": "high", "code_snippet": "open(base + filename)", "description": "Potential path traversal"},
+]
+
+class TestVulnerabilityClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = VulnerabilityClassifier()
+
+    def test_classify_batch_matches_single_predictions(self):
+        results = self.classifier.classify_batch(VULNERABILITIES)
+        self.assertEqual(len(results), len(VULNERABILITIES))
+
+        for vulnerability, result in zip(VULNERABILITIES, results):
+            # One model call per vulnerability, as classify() used to do
+            X = self.classifier.vectorizer.transform([self.classifier.extract_features(vulnerability)])
+            category_idx = self.classifier.model.predict(X)[0]
+            confidence = float(np.max(self.classifier.model.predict_proba(X)[0]))
+
+            self.assertEqual(result["category"], self.classifier.categories[int(category_idx)])
+            self.assertAlmostEqual(result["confidence"], confidence)
+            self.assertEqual(result, self.classifier.classify(vulnerability))
+
+    def test_classify_batch_empty(self):
+        self.assertEqual(self.classifier.classify_batch([]), [])
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("onnxruntime") and importlib.util.find_spec("skl2onnx"),
+        "onnxruntime and skl2onnx are optional"
+    )
+    def test_onnx_export_round_trip(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        model_path = os.path.join(temp_dir, "models", "classifier.joblib")
+        self.classifier.save_model(model_path, export_onnx=True)
+
+        loaded = VulnerabilityClassifier(model_path=model_path)
+        self.assertIsNotNone(loaded.onnx_session)
+        loaded.ONNX_BATCH_ROWS = 4  # split the batch into several ONNX calls
+        onnx_results = loaded.classify_batch(VULNERABILITIES)
+
+        sklearn_results = self.classifier.classify_batch(VULNERABILITIES)
+        for onnx_result, sklearn_result in zip(onnx_results, sklearn_results):
+            self.assertEqual(onnx_result["category"], sklearn_result["category"])
+            self.assertAlmostEqual(onnx_result["confidence"], sklearn_result["confidence"], places=5)
+
+class TestFixGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.fix_generator = FixGenerator()
+
+    def test_generate_fix_batch_keeps_input_order(self):
+        fixes = self.fix_generator.generate_fix_batch(VULNERABILITIES)
+        self.assertEqual(
+            fixes,
+            [self.fix_generator.generate_fix(vulnerability) for vulnerability in VULNERABILITIES]
+        )
+
+    def _secret_matches(self, code_snippet):
+        """(name, value) of the hardcoded_secrets match under RE2 and under re"""
+        with mock.patch("src.ml.fix_generator.re2", re):
+            fallback_generator = FixGenerator()
+
+        results = []
+        for fix_generator in (self.fix_generator, fallback_generator):
+            match = fix_generator._search(fix_generator.fix_templates["hardcoded_secrets"], code_snippet)
+            results.append(match.groups() if match else None)
+        return results
+
+    def test_hardcoded_secrets_match(self):
+        self.assertEqual(self._secret_matches('password = "hardcoded_secret123"'), [("password", "hardcoded_secret123")] * 2)
+
+    def test_hardcoded_secrets_skip_template_placeholders(self):
+        for code_snippet in ('url = "${BASE_URL}/api"', "token = '{{ api_token }}'", 'key = "abc"  # {{ later }}'):
+            with self.subTest(code_snippet=code_snippet):
+                self.assertEqual(self._secret_matches(code_snippet), [None, None])
+
+    def test_hardcoded_secrets_match_after_rejected_placeholder(self):
+        self.assertEqual(
+            self._secret_matches('url = "{{ base }}"\npassword = "hardcoded"'),
+            [("password", "hardcoded")] * 2
+        )
+        self.assertEqual(
+            self._secret_matches('url = "${BASE}" ; password = "hardcoded"'),
+            [("password", "hardcoded")] * 2
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from src.dashboard.stats_generator import StatsGenerator
+
+class TestStatsGenerator(unittest.TestCase):
+    
+    def setUp(self):
+        self.stats_generator = StatsGenerator()
+        self.vulnerabilities = [
+            {"type": "sql_injection", "risk_level": "critical", "file_path": "a.py", "confidence": 0.9},
+            {"type": "sql_injection", "risk_level": "critical", "file_path": "a.py", "confidence": 0.7},
+            {"type": "hardcoded_secrets", "risk_level": "medium", "file_path": "b.py", "confidence": "medium"},
+            {"type": "Command_Injection", "risk_level": "High", "file_path": "a.py", "confidence": 0.8},
+        ]
+    
+    def test_generate(self):
+        stats = self.stats_generator.generate(self.vulnerabilities)
+        
+        self.assertEqual(stats["total_vulnerabilities"], 4)
+        self.assertEqual(stats["risk_distribution"], {"critical": 2, "medium": 1, "high": 1})
+        self.assertEqual(stats["type_distribution"], {
+            "sql_injection": 2,
+            "hardcoded_secrets": 1,
+            "command_injection": 1,
+        })
+        self.assertEqual(list(stats["top_vulnerability_types"])[0], "sql_injection")
+        self.assertEqual(stats["top_vulnerable_files"], {"a.py": 3, "b.py": 1})
+        self.assertAlmostEqual(stats["average_confidence"], 0.6)
+    
+    def test_generate_empty(self):
+        stats = self.stats_generator.generate([])
+        self.assertEqual(stats["total_vulnerabilities"], 0)
+        self.assertEqual(stats["risk_distribution"], {})
+    
+    def test_from_aggregate_of_merged_scans(self):
+        first = self.stats_generator.aggregate(self.vulnerabilities[:2])
+        second = self.stats_generator.aggregate(self.vulnerabilities[2:])
+        merged = {
+            "total": first["total"] + second["total"],
+            "confidence_sum": first["confidence_sum"] + second["confidence_sum"],
+            "risk": first["risk"] + second["risk"],
+            "type": first["type"] + second["type"],
+            "file": first["file"] + second["file"],
+        }
+        
+        stats = self.stats_generator.from_aggregate(merged)
+        expected = self.stats_generator.generate(self.vulnerabilities)
+        stats.pop("generated_at")
+        expected.pop("generated_at")
+        self.assertEqual(stats, expected)
+    
+    def test_generate_trend_data(self):
+        scan_result = {
+            "scan_id": "scan-1",
+            "timestamp": "2025-01-01T00:00:00",
+            "stats": self.stats_generator.generate(self.vulnerabilities),
+            "risk_score": 42.0,
+        }
+        point = self.stats_generator.trend_point(scan_result)
+        
+        trend_data = self.stats_generator.generate_trend_data([point])
+        self.assertEqual(trend_data["dates"], ["2025-01-01T00:00:00"])
+        self.assertEqual(trend_data["critical"], [2])
+        self.assertEqual(trend_data["high"], [1])
+        self.assertEqual(trend_data["low"], [0])
+        self.assertEqual(trend_data["risk_scores"], [42.0])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
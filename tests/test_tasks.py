@@ -0,0 +1,118 @@
+import unittest
+import os
+import tempfile
+import pygit2
+from src import tasks
+
+class TestScanTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.signature = pygit2.Signature("test", "test@example.com")
+
+        self.python_file = os.path.join(self.temp_dir, "sample.py")
+        with open(self.python_file, "w") as f:
+            f.write("""
+import os
+
+def execute_command(user_input):
+    os.system("echo " + user_input)
+
+password = "hardcoded_secret123"
+""")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_run_pool_shares_one_pool(self):
+        expected = tasks.get_vuln_detector().scan_file(self.python_file)
+
+        first = tasks._run_pool([self.python_file])
+        pool = tasks.get_scan_pool()
+        second = tasks._run_pool([self.python_file, self.python_file])
+
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected * 2)
+        self.assertIs(tasks.get_scan_pool(), pool)
+
+    def _make_upstream(self):
+        """Create a repository with a main branch, a tag and a second branch"""
+        upstream_dir = os.path.join(self.temp_dir, "upstream")
+        upstream = pygit2.init_repository(upstream_dir, initial_head="main")
+        first = self._commit(upstream, "a.py")
+        second = self._commit(upstream, "b.py")
+        upstream.create_tag("v1", second, pygit2.enums.ObjectType.COMMIT, self.signature, "v1")
+        upstream.create_branch("other", upstream[first])
+        return upstream
+
+    def _commit(self, repo, filename):
+        with open(os.path.join(repo.workdir, filename), "w") as f:
+            f.write("x = 1\n")
+        repo.index.add(filename)
+        repo.index.write()
+        parents = [] if repo.head_is_unborn else [repo.head.target]
+        return repo.create_commit("refs/heads/main", self.signature, self.signature, filename, repo.index.write_tree(), parents)
+
+    def test_checkout_repository_fetches_only_the_branch(self):
+        upstream = self._make_upstream()
+        repo_dir = os.path.join(self.temp_dir, "checkout")
+
+        # The local transport cannot fetch shallow, so fetch full history
+        tasks._checkout_repository(upstream.path, repo_dir, "main", 0)
+        repo = pygit2.Repository(repo_dir)
+        self.assertEqual(list(repo.references), ["refs/remotes/origin/main"])
+        self.assertTrue(os.path.exists(os.path.join(repo_dir, "b.py")))
+
+        # Later scans check out the new branch tip over the cached tree
+        self._commit(upstream, "c.py")
+        tasks._checkout_repository(upstream.path, repo_dir, "main", 0)
+        self.assertEqual(list(repo.references), ["refs/remotes/origin/main"])
+        self.assertEqual(repo.head.target, upstream.head.target)
+        self.assertTrue(os.path.exists(os.path.join(repo_dir, "c.py")))
+
+    def test_checkout_repository_defaults_to_remote_head(self):
+        upstream = self._make_upstream()
+        repo_dir = os.path.join(self.temp_dir, "checkout")
+
+        # A scan request with "branch": null checks out the default branch
+        tasks._checkout_repository(upstream.path, repo_dir, None, 0)
+        repo = pygit2.Repository(repo_dir)
+        self.assertEqual(list(repo.references), ["refs/remotes/origin/main"])
+        self.assertEqual(repo.head.target, upstream.head.target)
+
+    def test_checkout_repository_replaces_broken_checkout(self):
+        upstream = self._make_upstream()
+        repo_dir = os.path.join(self.temp_dir, "checkout")
+
+        # A clone killed before it fetched anything leaves an empty repository
+        pygit2.init_repository(repo_dir)
+        tasks._checkout_repository(upstream.path, repo_dir, "main", 0)
+        self.assertEqual(pygit2.Repository(repo_dir).head.target, upstream.head.target)
+
+        # A corrupt .git directory is replaced as well
+        with open(os.path.join(repo_dir, ".git", "HEAD"), "w") as f:
+            f.write("garbage")
+        tasks._checkout_repository(upstream.path, repo_dir, "main", 0)
+        self.assertEqual(pygit2.Repository(repo_dir).head.target, upstream.head.target)
+
+    def test_checkout_repository_keeps_checkout_on_fetch_error(self):
+        upstream = self._make_upstream()
+        repo_dir = os.path.join(self.temp_dir, "checkout")
+        tasks._checkout_repository(upstream.path, repo_dir, "main", 0)
+
+        # A missing branch fails the scan without discarding the cached clone
+        with self.assertRaises(ValueError):
+            tasks._checkout_repository(upstream.path, repo_dir, "missing", 0)
+        repo = pygit2.Repository(repo_dir)
+        self.assertEqual(repo.head.target, upstream.head.target)
+        self.assertTrue(os.path.exists(os.path.join(repo_dir, "b.py")))
+
+        # So does an unreachable remote
+        os.rename(upstream.workdir, os.path.join(self.temp_dir, "moved"))
+        with self.assertRaises(pygit2.GitError):
+            tasks._checkout_repository(upstream.path, repo_dir, "main", 0)
+        self.assertTrue(os.path.exists(os.path.join(repo_dir, "b.py")))
+
+if __name__ == "__main__":
+    unittest.main()